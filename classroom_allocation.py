@@ -4,27 +4,52 @@ custo de locomoção de professores e alunos.
 """
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple, Optional, Callable
+from typing import Dict, List, Tuple, Optional, Callable, Union
 import math
 import random
 
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:  # numba é opcional: sem ele ls_kernel roda como Python puro e cost_matrix usa broadcasting
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+    prange = range
+
 # ----------------
 # Modelagem básica
 # ----------------
-@dataclass
+@dataclass(slots=True)
 class Room:
     id: str
     capacity: int
-    coord: Tuple[float, float]  # (x, y) no plano do campus
+    x: float  # posição no plano do campus
+    y: float
     schedule: Dict[int, str] = field(default_factory=dict)  # timeslot -> course_id
 
+    @property
+    def coord(self) -> Tuple[float, float]:
+        return (self.x, self.y)
+
     def is_available(self, timeslot: int, size: int) -> bool:
         return timeslot not in self.schedule and self.capacity >= size
 
-@dataclass
+@dataclass(slots=True)
 class Person:
     id: str
-    coord: Tuple[float, float]
+    x: float
+    y: float
+
+    @property
+    def coord(self) -> Tuple[float, float]:
+        return (self.x, self.y)
 
 @dataclass
 class Course:
@@ -33,152 +58,291 @@ class Course:
     teacher: Person
     students: List[Person]
     timeslot: int  # inteiro representando horário (ex.: 0 = seg‑8h, 1 = seg‑10h …)
+    # Coordenadas em layout SoA (preenchidas no __post_init__)
+    teacher_xy: np.ndarray = field(init=False, repr=False, compare=False)
+    students_xy: np.ndarray = field(init=False, repr=False, compare=False)  # shape (N, 2)
+
+    def __post_init__(self) -> None:
+        self.teacher_xy = np.array([self.teacher.x, self.teacher.y], dtype=np.float64)
+        self.students_xy = np.array([(p.x, p.y) for p in self.students],
+                                    dtype=np.float64).reshape(-1, 2)
+
+# ----------------
+# Layout SoA (colunar) usado internamente pelas heurísticas
+# ----------------
+@dataclass
+class CampusData:
+    rooms_xy: np.ndarray           # (n_rooms, 2)
+    rooms_cap: np.ndarray          # (n_rooms,)
+    rooms_schedule: np.ndarray     # bool (n_rooms, n_timeslots): sala já ocupada no horário
+    course_teacher_xy: np.ndarray  # (n_courses, 2)
+    course_sizes: np.ndarray       # (n_courses,)
+    course_timeslots: np.ndarray   # (n_courses,): coluna do horário em rooms_schedule (renumerado 0..n-1)
+    students_xy: np.ndarray        # (total de alunos, 2); alunos do curso c em [offsets[c], offsets[c + 1])
+    students_offsets: np.ndarray   # (n_courses + 1,)
+
+def build_soa(courses: List[Course], rooms: List[Room]) -> CampusData:
+    """Converte as dataclasses (front end) em arrays NumPy paralelos."""
+    # Horários podem ser quaisquer inteiros (inclusive negativos): mapeia para colunas densas
+    booked = [(j, t) for j, r in enumerate(rooms) for t in r.schedule]
+    raw = np.array([c.timeslot for c in courses] + [t for _, t in booked], dtype=np.int64)
+    slots, cols = np.unique(raw, return_inverse=True)
+    rooms_schedule = np.zeros((len(rooms), len(slots)), dtype=bool)
+    rooms_schedule[[j for j, _ in booked], cols[len(courses):]] = True
+    offsets = np.zeros(len(courses) + 1, dtype=np.int64)
+    np.cumsum(np.array([len(c.students_xy) for c in courses], dtype=np.int64), out=offsets[1:])
+    return CampusData(
+        rooms_xy=np.array([(r.x, r.y) for r in rooms], dtype=np.float64).reshape(-1, 2),
+        rooms_cap=np.array([r.capacity for r in rooms], dtype=np.int64),
+        rooms_schedule=rooms_schedule,
+        course_teacher_xy=np.array([c.teacher_xy for c in courses], dtype=np.float64).reshape(-1, 2),
+        course_sizes=np.array([c.size for c in courses], dtype=np.int64),
+        course_timeslots=cols[:len(courses)].astype(np.int64),
+        students_xy=np.concatenate([c.students_xy for c in courses] + [np.empty((0, 2))]),
+        students_offsets=offsets,
+    )
 
 # ---------------
 # Funções utilitárias
 # ---------------
 
 def euclidean(a: Tuple[float, float], b: Tuple[float, float]) -> float:
-    return math.dist(a, b)
+    dx = a[0] - b[0]
+    dy = a[1] - b[1]
+    return math.sqrt(dx * dx + dy * dy)
 
 def travel_cost(course: Course, room: Room) -> float:
-    """Soma distâncias professor + alunos (pode amostrar p/ ganhar desempenho)."""
-    teacher_cost = euclidean(course.teacher.coord, room.coord)
-    # Amostragem dos alunos p/ evitar O(N) em turmas grandes (parâmetro k)
-    k = min(30, len(course.students))
-    sample = random.sample(course.students, k) if k < len(course.students) else course.students
-    student_cost = sum(euclidean(s.coord, room.coord) for s in sample) * (len(course.students) / k)
-    return teacher_cost + student_cost
+    """Soma exata das distâncias professor + todos os alunos (sem amostragem, logo determinística)."""
+    # Professor e alunos numa única passada vetorizada
+    diff = np.vstack((course.teacher_xy, course.students_xy)) - (room.x, room.y)
+    return float(np.sqrt(np.einsum('ij,ij->i', diff, diff)).sum())
+
+@njit(cache=True, parallel=True)
+def cost_matrix_kernel(teachers_xy: np.ndarray, students_xy: np.ndarray, offsets: np.ndarray,
+                       rooms_xy: np.ndarray) -> np.ndarray:
+    """Laço tipado que monta D; alunos do curso c são students_xy[offsets[c]:offsets[c + 1]]."""
+    n_courses = teachers_xy.shape[0]
+    n_rooms = rooms_xy.shape[0]
+    D = np.empty((n_courses, n_rooms), dtype=np.float64)
+    for c in prange(n_courses):  # cursos em paralelo, sem GIL
+        for r in range(n_rooms):
+            rx = rooms_xy[r, 0]
+            ry = rooms_xy[r, 1]
+            dx = teachers_xy[c, 0] - rx
+            dy = teachers_xy[c, 1] - ry
+            total = math.sqrt(dx * dx + dy * dy)
+            for s in range(offsets[c], offsets[c + 1]):
+                dx = students_xy[s, 0] - rx
+                dy = students_xy[s, 1] - ry
+                total += math.sqrt(dx * dx + dy * dy)
+            D[c, r] = total
+    return D
+
+def allocation_to_dict(alloc: np.ndarray, courses: List[Course], rooms: List[Room]) -> Dict[str, str]:
+    """Converte alloc[c] = índice da sala em dict course_id -> room_id (fronteira da API)."""
+    return {course.id: rooms[j].id for course, j in zip(courses, alloc)}
+
+def cost_matrix(courses: List[Course], rooms: List[Room], data: Optional[CampusData] = None) -> np.ndarray:
+    """Matriz D[c, r] = travel_cost(courses[c], rooms[r]), calculada uma única vez (coordenadas são estáticas)."""
+    if data is None:
+        data = build_soa(courses, rooms)
+    if HAS_NUMBA:
+        return cost_matrix_kernel(data.course_teacher_xy, data.students_xy, data.students_offsets, data.rooms_xy)
+    # Sem numba o kernel seria um laço triplo em Python puro: usa broadcasting por curso
+    rooms_xy = data.rooms_xy
+    offsets = data.students_offsets
+    D = np.empty((len(data.course_sizes), len(rooms_xy)), dtype=np.float64)
+    for c_idx in range(len(D)):
+        students_xy = data.students_xy[offsets[c_idx]:offsets[c_idx + 1]]
+        d_teacher = np.linalg.norm(rooms_xy - data.course_teacher_xy[c_idx], axis=1)
+        d_students = np.sqrt(
+            ((students_xy[:, None, :] - rooms_xy[None, :, :]) ** 2).sum(-1)
+        ).sum(0)
+        D[c_idx] = d_teacher + d_students
+    return D
 
 # -----------------------
 # 1. Algoritmo Guloso
 # -----------------------
 
-def greedy_allocate(courses: List[Course], rooms: List[Room]) -> Dict[str, str]:
-    """Retorna dict course_id -> room_id"""
-    allocation: Dict[str, str] = {}
+def greedy_allocate(courses: List[Course], rooms: List[Room],
+                    D: Optional[np.ndarray] = None, data: Optional[CampusData] = None) -> np.ndarray:
+    """Retorna alloc[c] = índice (em rooms) da sala do curso c.
+
+    Efeito colateral: marca as salas escolhidas em Room.schedule e em data.rooms_schedule
+    (in-place). Reusar o mesmo data depois, p.ex. em genetic_allocate, enxerga essas reservas.
+    """
+    if data is None:
+        data = build_soa(courses, rooms)
+    if D is None:
+        D = cost_matrix(courses, rooms, data)
+    room_cap = data.rooms_cap
+    room_busy = data.rooms_schedule
+    alloc = np.full(len(courses), -1, dtype=np.int32)
     # Ordena cursos decrescentemente pelo tamanho (first‑fit decreasing)
-    for course in sorted(courses, key=lambda c: c.size, reverse=True):
-        feasible = [r for r in rooms if r.is_available(course.timeslot, course.size)]
-        if not feasible:
+    for c_idx in np.argsort(-data.course_sizes, kind="stable"):
+        course = courses[c_idx]
+        ts = data.course_timeslots[c_idx]
+        mask = ~room_busy[:, ts] & (room_cap >= data.course_sizes[c_idx])
+        if not mask.any():
             raise RuntimeError(f"Sem sala disponível para disciplina {course.id} no horário {course.timeslot}")
-        best_room = min(feasible, key=lambda r: travel_cost(course, r))
-        best_room.schedule[course.timeslot] = course.id
-        allocation[course.id] = best_room.id
-    return allocation
+        best = int(np.where(mask, D[c_idx], np.inf).argmin())
+        room_busy[best, ts] = True
+        rooms[best].schedule[course.timeslot] = course.id
+        alloc[c_idx] = best
+    return alloc
 
 # -----------------------
 # 2. Busca Local (swap‑based)
 # -----------------------
 
-def local_search(allocation: Dict[str, str], courses: List[Course], rooms: Dict[str, Room],
-                 max_iter: int = 10_000) -> Dict[str, str]:
-    """Hill climbing + retrocesso se atingir mínimo local."""
-    def cost_of_alloc(alloc: Dict[str, str]) -> float:
-        return sum(travel_cost(course, rooms[alloc[course.id]]) for course in courses)
-
-    current = allocation.copy()
-    current_cost = cost_of_alloc(current)
-    for _ in range(max_iter):
-        c1, c2 = random.sample(courses, 2)
-        if c1.timeslot != c2.timeslot:  # só trocamos se horários coincidem
+@njit(cache=True)
+def ls_kernel(alloc: np.ndarray, D: np.ndarray, sizes: np.ndarray, caps: np.ndarray,
+              timeslots: np.ndarray, pairs: np.ndarray, cost: float, patience: int) -> float:
+    """Laço de trocas sobre arrays inteiros (alloc[c] = índice da sala); altera alloc in-place.
+
+    pairs[k] = (c1, c2) é o par de cursos proposto na iteração k, sorteado de antemão.
+    cost é o custo inicial de alloc, mantido só via delta; retorna o custo final.
+    Para após patience propostas rejeitadas seguidas (patience <= 0 desativa).
+    """
+    rejected = 0
+    for k in range(pairs.shape[0]):
+        if patience > 0 and rejected >= patience:  # platô: mínimo local provável
+            break
+        rejected += 1
+        c1 = pairs[k, 0]
+        c2 = pairs[k, 1]
+        if timeslots[c1] != timeslots[c2]:  # só trocamos se horários coincidem
             continue
-        r1, r2 = rooms[current[c1.id]], rooms[current[c2.id]]
+        r1 = alloc[c1]
+        r2 = alloc[c2]
         # Verifica restrições de capacidade
-        if r1.capacity < c2.size or r2.capacity < c1.size:
+        if caps[r1] < sizes[c2] or caps[r2] < sizes[c1]:
             continue
-        # Custo após a troca
-        delta = (
-            travel_cost(c1, r2) + travel_cost(c2, r1)
-            - travel_cost(c1, r1) - travel_cost(c2, r2)
-        )
+        # Custo após a troca (D precisa ser de distâncias reais: cada entrada é uma soma
+        # de raízes, e distâncias ao quadrado não preservam a ordem dessas somas)
+        delta = D[c1, r2] + D[c2, r1] - D[c1, r1] - D[c2, r2]
         if delta < 0:  # melhora!
-            current[c1.id], current[c2.id] = r2.id, r1.id
-            current_cost += delta
-    return current
+            alloc[c1] = r2
+            alloc[c2] = r1
+            cost += delta
+            rejected = 0
+    return cost
+
+def local_search(allocation: np.ndarray, courses: List[Course], rooms: List[Room],
+                 max_iter: int = 10_000, D: Optional[np.ndarray] = None,
+                 seed: Optional[int] = None, data: Optional[CampusData] = None,
+                 patience: Optional[int] = None,
+                 return_cost: bool = False) -> Union[np.ndarray, Tuple[np.ndarray, float]]:
+    """Hill climbing + retrocesso se atingir mínimo local.
+
+    patience: encerra após esse número de propostas rejeitadas seguidas (None = usa todas as max_iter).
+    Os max_iter pares são sorteados de antemão, então patience encurta só o laço de trocas.
+    return_cost: retorna (alloc, custo final), com o custo mantido incrementalmente pelo kernel.
+    """
+    if data is None:
+        data = build_soa(courses, rooms)
+    if D is None:
+        D = cost_matrix(courses, rooms, data)
+    alloc = np.array(allocation, dtype=np.int32)  # cópia: o kernel altera in-place
+
+    # Agrupa cursos por horário: só pares do mesmo balde são trocas válidas
+    bucket_order = np.argsort(data.course_timeslots, kind="stable")
+    _, bucket_start, bucket_len = np.unique(data.course_timeslots[bucket_order],
+                                            return_index=True, return_counts=True)
+    weights = bucket_len * (bucket_len - 1)  # nº de pares ordenados em cada balde
+    if weights.sum() == 0:
+        return (alloc, float(D[np.arange(len(alloc)), alloc].sum())) if return_cost else alloc
+
+    # Sorteia todos os pares de uma vez: balde ponderado, depois c2 != c1 sem rejeição
+    rng = np.random.default_rng(seed)
+    b = rng.choice(len(weights), size=max_iter, p=weights / weights.sum())
+    i1 = rng.integers(0, bucket_len[b])
+    i2 = rng.integers(0, bucket_len[b] - 1)
+    i2 += i2 >= i1
+    pairs = np.empty((max_iter, 2), dtype=np.int32)
+    pairs[:, 0] = bucket_order[bucket_start[b] + i1]
+    pairs[:, 1] = bucket_order[bucket_start[b] + i2]
+
+    D = np.ascontiguousarray(D, dtype=np.float64)
+    # Custo inicial só é necessário se for retornado; o kernel o atualiza via delta
+    current_cost = D[np.arange(len(alloc)), alloc].sum() if return_cost else 0.0
+    current_cost = ls_kernel(alloc, D, data.course_sizes, data.rooms_cap, data.course_timeslots, pairs,
+                             current_cost, patience or 0)
+    return (alloc, float(current_cost)) if return_cost else alloc
 
 # ------------------------------------------
 # 3. Algoritmo Genético (versão compacta)
 # ------------------------------------------
 
 def genetic_allocate(courses: List[Course], rooms: List[Room], pop_size: int = 50,
-                     generations: int = 200, crossover_rate: float = 0.8, mutation_rate: float = 0.2) -> Dict[str, str]:
-    """Chromossomo: lista de indices de salas para cada curso (ordem fixa)."""
-    rng = random.Random(42)
+                     generations: int = 200, crossover_rate: float = 0.8, mutation_rate: float = 0.2,
+                     D: Optional[np.ndarray] = None, data: Optional[CampusData] = None) -> np.ndarray:
+    """Chromossomo: linha de uma matriz (pop_size, n_courses) com índices de salas (ordem fixa)."""
+    rng = np.random.default_rng(42)
     n_courses = len(courses)
+    if data is None:
+        data = build_soa(courses, rooms)
+    if D is None:
+        D = cost_matrix(courses, rooms, data)
+    course_idx = np.arange(n_courses)
 
     # Pré‑processa salas viáveis por curso/horário
     feasible_rooms = [
-        [i for i, r in enumerate(rooms) if r.capacity >= course.size and course.timeslot not in r.schedule]
-        for course in courses
+        np.flatnonzero((data.rooms_cap >= size) & ~data.rooms_schedule[:, ts]).astype(np.int32)
+        for size, ts in zip(data.course_sizes, data.course_timeslots)
     ]
+    # Mesmas listas em formato plano + offsets, para sorteios vetorizados
+    feasible_len = np.array([len(fr) for fr in feasible_rooms], dtype=np.int64)
+    feasible_offsets = np.concatenate(([0], np.cumsum(feasible_len)[:-1]))
+    feasible_flat = np.concatenate(feasible_rooms + [np.empty(0, dtype=np.int32)])
+    half = pop_size // 2
 
-    def random_chrom():
-        return [rng.choice(fr) for fr in feasible_rooms]
+    def fitness(pop: np.ndarray) -> np.ndarray:
+        # Um único gather avalia a população inteira
+        return D[course_idx, pop].sum(axis=1)
 
-    def fitness(chrom):
-        return sum(travel_cost(courses[i], rooms[idx]) for i, idx in enumerate(chrom))
-
-    population = [random_chrom() for _ in range(pop_size)]
+    # Cada gene sorteado direto do array de salas viáveis do curso
+    picks = rng.integers(0, feasible_len, size=(pop_size, n_courses))
+    population = feasible_flat[feasible_offsets + picks]
+    fits = fitness(population)
 
     for _ in range(generations):
-        # Seleção por torneio 2‑way
-        parents = [min(random.sample(population, 2), key=fitness) for _ in range(pop_size)]
-        offspring = []
-        for i in range(0, pop_size, 2):
-            p1, p2 = parents[i], parents[i + 1]
-            if rng.random() < crossover_rate:
-                cut = rng.randrange(1, n_courses)
-                child1 = p1[:cut] + p2[cut:]
-                child2 = p2[:cut] + p1[cut:]
-            else:
-                child1, child2 = p1[:], p2[:]
-            offspring.extend([child1, child2])
+        # Seleção por torneio 2‑way (b != a)
+        a = rng.integers(0, pop_size, size=pop_size)
+        b = (a + rng.integers(1, pop_size, size=pop_size)) % pop_size
+        parents = population[np.where(fits[a] <= fits[b], a, b)]
+        # Crossover de 1 ponto para todos os pares (p1, p2) = linhas (2i, 2i+1)
+        p1, p2 = parents[0:2 * half:2], parents[1:2 * half:2]
+        do_cx = rng.random(half) < crossover_rate
+        cuts = rng.integers(1, n_courses, size=half)
+        swap = do_cx[:, None] & (course_idx[None, :] >= cuts[:, None])
+        offspring = parents.copy()
+        offspring[0:2 * half:2] = np.where(swap, p2, p1)
+        offspring[1:2 * half:2] = np.where(swap, p1, p2)
         # Mutação
-        for chrom in offspring:
-            if rng.random() < mutation_rate:
-                idx = rng.randrange(n_courses)
-                chrom[idx] = rng.choice(feasible_rooms[idx])
+        rows = np.flatnonzero(rng.random(pop_size) < mutation_rate)
+        genes = rng.integers(0, n_courses, size=rows.size)
+        picks = rng.integers(0, feasible_len[genes])
+        offspring[rows, genes] = feasible_flat[feasible_offsets[genes] + picks]
         # Substituição: elitismo 1
-        population.extend(offspring)
-        population.sort(key=fitness)
-        population = population[:pop_size]
-    best = min(population, key=fitness)
-    return {course.id: rooms[idx].id for course, idx in zip(courses, best)}
+        population = np.concatenate([population, offspring])
+        fits = np.concatenate([fits, fitness(offspring)])
+        # Seleção parcial O(n): só os pop_size melhores, sem ordenar
+        keep = np.argpartition(fits, pop_size - 1)[:pop_size]
+        population, fits = population[keep], fits[keep]
+    return population[fits.argmin()].copy()
 
 # --------------------------
 # Exemplo mínimo de uso real
 # --------------------------
-# if __name__ == "__main__":
-#     # Geração de dados sintéticos p/ demonstração
-#     rng = random.Random(0)
-#     rooms = [Room(f"R{i}", capacity=rng.randint(30, 120), coord=(rng.random()*100, rng.random()*100)) for i in range(20)]
-
-#     teachers = [Person(f"T{i}", coord=(rng.random()*100, rng.random()*100)) for i in range(10)]
-#     students_pool = [Person(f"S{i}", coord=(rng.random()*100, rng.random()*100)) for i in range(300)]
-
-#     courses = []
-#     for i in range(25):
-#         size = rng.randint(20, 80)
-#         teacher = rng.choice(teachers)
-#         students = rng.sample(students_pool, size)
-#         timeslot = rng.randint(0, 4)  # 5 horários distintos
-#         courses.append(Course(f"C{i}", size, teacher, students, timeslot))
-
-#     # Alocação gulosa seguida de busca local
-#     base_alloc = greedy_allocate(courses, rooms)
-#     improved_alloc = local_search(base_alloc, courses, {r.id: r for r in rooms})
-
-#     print("Alocação final (curso -> sala):")
-#     for cid, rid in improved_alloc.items():
-#         print(cid, "->", rid)
 if __name__ == "__main__":
     # Geração de dados sintéticos p/ demonstração
     rng = random.Random(0)
-    rooms = [Room(f"R{i}", capacity=rng.randint(30, 120), coord=(rng.random()*100, rng.random()*100)) for i in range(20)]
+    rooms = [Room(f"R{i}", capacity=rng.randint(30, 120), x=rng.random()*100, y=rng.random()*100) for i in range(20)]
 
-    teachers = [Person(f"T{i}", coord=(rng.random()*100, rng.random()*100)) for i in range(10)]
-    students_pool = [Person(f"S{i}", coord=(rng.random()*100, rng.random()*100)) for i in range(300)]
+    teachers = [Person(f"T{i}", x=rng.random()*100, y=rng.random()*100) for i in range(10)]
+    students_pool = [Person(f"S{i}", x=rng.random()*100, y=rng.random()*100) for i in range(300)]
 
     courses = []
     for i in range(25):
@@ -192,18 +356,29 @@ if __name__ == "__main__":
     # Execução dos 3 métodos
     # ------------------------------
 
+    # Layout SoA e matriz de custos curso x sala, compartilhados pelos 3 métodos
+    data = build_soa(courses, rooms)
+    D = cost_matrix(courses, rooms, data)
+
     # 1) Algoritmo Guloso
-    greedy_alloc = greedy_allocate(courses, rooms)
+    greedy_idx = greedy_allocate(courses, rooms, D=D, data=data)
 
     # 2) Busca Local sobre a solução gulosa
-    local_alloc = local_search(greedy_alloc, courses, {r.id: r for r in rooms})
+    local_idx = local_search(greedy_idx, courses, rooms, D=D, data=data)
 
     # 3) Algoritmo Genético
-    genetic_alloc = genetic_allocate(courses, rooms)
+    genetic_idx = genetic_allocate(courses, rooms, D=D, data=data)
+
+    # Conversão para course_id -> room_id só na saída
+    greedy_alloc, local_alloc, genetic_alloc = (
+        allocation_to_dict(a, courses, rooms) for a in (greedy_idx, local_idx, genetic_idx)
+    )
 
     # Função auxiliar para custo total
+    rooms_by_id = {r.id: r for r in rooms}
+
     def total_cost(alloc):
-        return sum(travel_cost(c, {r.id: r for r in rooms}[alloc[c.id]]) for c in courses)
+        return sum(travel_cost(c, rooms_by_id[alloc[c.id]]) for c in courses)
 
     print(" Resultados ---")
     print(f"Guloso:        custo = {total_cost(greedy_alloc):.2f}")